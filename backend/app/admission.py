@@ -0,0 +1,138 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+from fastapi import HTTPException
+import math
+import os
+import time
+
+# Admission control for ingest routes (POST /events, POST /test/submit).
+# Exam days flood ingest; every event costs several commits, so we shed load
+# here before it reaches Postgres and keep threads/connections free for reads.
+#
+# All limits are per process: with N uvicorn workers the effective global rate
+# and in-flight cap are N times the configured values, so size them per worker.
+#
+# Rates are in events: POST /events costs 1 token, POST /test/submit costs
+# DAILY_TEST_SIZE + 1 (the attempt row plus up to one event per question topic).
+# In-flight counts requests, not events.
+
+INGEST_GLOBAL_RATE = float(os.getenv("INGEST_GLOBAL_RATE", "200"))      # events/sec, all students
+INGEST_GLOBAL_BURST = float(os.getenv("INGEST_GLOBAL_BURST", "400"))
+INGEST_STUDENT_RATE = float(os.getenv("INGEST_STUDENT_RATE", "2"))      # events/sec, per student
+INGEST_STUDENT_BURST = float(os.getenv("INGEST_STUDENT_BURST", "10"))
+INGEST_MAX_IN_FLIGHT = int(os.getenv("INGEST_MAX_IN_FLIGHT", "8"))      # keep below DB pool size
+MAX_TRACKED_STUDENTS = 10000
+
+class TokenBucket:
+    """
+    Classic token bucket: refills at `rate` tokens/sec up to `capacity`.
+    """
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def try_acquire(self, cost: float = 1):
+        """
+        Takes `cost` tokens if available. Returns (ok, seconds until they are available).
+        Costs above capacity are clamped so a large request can still get through.
+        """
+        cost = min(cost, self.capacity)
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True, 0.0
+        return False, (cost - self.tokens) / self.rate
+
+    def refund(self, cost: float = 1):
+        """
+        Returns tokens taken by a request that was rejected further down the chain.
+        """
+        self.tokens = min(self.capacity, self.tokens + min(cost, self.capacity))
+
+class AdmissionController:
+    """
+    Global + per-student token buckets and a bounded in-flight limit.
+    Rejections raise HTTPException with a Retry-After header.
+    """
+    def __init__(self, global_rate=INGEST_GLOBAL_RATE, global_burst=INGEST_GLOBAL_BURST,
+                 student_rate=INGEST_STUDENT_RATE, student_burst=INGEST_STUDENT_BURST,
+                 max_in_flight=INGEST_MAX_IN_FLIGHT, clock=time.monotonic):
+        self.student_rate = student_rate
+        self.student_burst = student_burst
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+        self.global_bucket = TokenBucket(global_rate, global_burst, clock)
+        self.student_buckets = OrderedDict()
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = {"student_rate_limited": 0, "global_rate_limited": 0, "saturated": 0}
+        self.lock = Lock()
+
+    def _student_bucket(self, student_id: str) -> TokenBucket:
+        bucket = self.student_buckets.get(student_id)
+        if bucket is None:
+            bucket = TokenBucket(self.student_rate, self.student_burst, self.clock)
+            self.student_buckets[student_id] = bucket
+            if len(self.student_buckets) > MAX_TRACKED_STUDENTS:
+                self.student_buckets.popitem(last=False)
+        else:
+            self.student_buckets.move_to_end(student_id)
+        return bucket
+
+    def _reject(self, reason: str, status_code: int, retry_after: float):
+        self.shed[reason] += 1
+        raise HTTPException(
+            status_code=status_code,
+            detail="Too many requests" if status_code == 429 else "Ingest saturated, retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+    def acquire(self, student_id: str, cost: int = 1):
+        with self.lock:
+            if self.in_flight >= self.max_in_flight:
+                self._reject("saturated", 503, 1)
+
+            # Global first, so a global storm doesn't drain well-behaved students' buckets
+            ok, wait = self.global_bucket.try_acquire(cost)
+            if not ok:
+                self._reject("global_rate_limited", 503, wait)
+
+            ok, wait = self._student_bucket(student_id).try_acquire(cost)
+            if not ok:
+                self.global_bucket.refund(cost)
+                self._reject("student_rate_limited", 429, wait)
+
+            self.in_flight += 1
+            self.admitted += 1
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    @contextmanager
+    def admit(self, student_id: str, cost: int = 1):
+        self.acquire(student_id, cost)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def metrics(self) -> dict:
+        with self.lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+                "shed_total": sum(self.shed.values()),
+                "tracked_students": len(self.student_buckets),
+            }
+
+ingest_gate = AdmissionController()
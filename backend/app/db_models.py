@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Float, Boolean, ForeignKey, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Date, Float, Boolean, ForeignKey, DateTime, Text, JSON, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime
@@ -25,6 +25,7 @@ class Course(Base):
     
     enrollments = relationship("Enrollment", back_populates="course")
     content = relationship("CourseContent", back_populates="course")
+    questions = relationship("TestQuestion", back_populates="course")
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
@@ -46,6 +47,46 @@ class CourseContent(Base):
     details = Column(JSON) # due date, max score, etc.
     
     course = relationship("Course", back_populates="content")
+    questions = relationship("TestQuestion", back_populates="content")
+
+class TestQuestion(Base):
+    __tablename__ = "test_questions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), index=True)
+    content_id = Column(Integer, ForeignKey("course_content.id"), nullable=True)
+    topic = Column(String, index=True)
+    question = Column(Text)
+    options = Column(JSON) # List of strings
+    correct_option = Column(Integer) # Index into options, never sent to clients
+
+    course = relationship("Course", back_populates="questions")
+    content = relationship("CourseContent", back_populates="questions")
+
+class DailyTestSelection(Base):
+    __tablename__ = "daily_tests"
+    __table_args__ = (
+        UniqueConstraint("course_id", "date", name="uq_daily_test_course_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, nullable=False, default=0) # 0 = whole question bank
+    date = Column(Date, nullable=False)
+    question_ids = Column(JSON) # Ordered list of TestQuestion ids served that day
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class DailyTestAttempt(Base):
+    __tablename__ = "daily_test_attempts"
+    __table_args__ = (
+        UniqueConstraint("student_id", "course_id", "date", name="uq_daily_test_attempt"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(String, ForeignKey("students.id"), nullable=False)
+    course_id = Column(Integer, nullable=False, default=0) # 0 = whole question bank
+    date = Column(Date, nullable=False)
+    score = Column(Integer)
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 class Reward(Base):
     __tablename__ = "rewards"
@@ -80,3 +121,20 @@ class DailySummary(Base):
     avg_score = Column(Float, default=0.0)
     progress_score = Column(Float, default=0.0)
     is_valid_day = Column(Boolean, default=False)
+
+class TopicMastery(Base):
+    __tablename__ = "topic_mastery"
+    __table_args__ = (
+        UniqueConstraint("student_id", "topic", name="uq_topic_mastery_student_topic"),
+        # Weak/strong classification is a range scan on avg_score within a topic
+        Index("ix_topic_mastery_topic_avg_score", "topic", "avg_score"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(String, ForeignKey("students.id"), nullable=False)
+    topic = Column(String, nullable=False)
+    event_count = Column(Integer, default=0)
+    avg_score = Column(Float, default=0.0)
+    last_score = Column(Integer)
+    trend = Column(Float, default=0.0) # last score minus the running average before it
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
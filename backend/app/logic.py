@@ -1,20 +1,54 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import desc, func, insert, select, case, cast, literal, text, DateTime, Float
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from . import db_models as models
-from .models import LearningEvent, StreakInfo
-from datetime import date, timedelta
+from .models import LearningEvent, StreakInfo, ActivityType, DailyTest, DailyTestQuestion, DailyTestResult
+from . import models as schemas
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from threading import Lock
 import math
+import random
+import time
 
-def process_learning_event(db: Session, event_data: LearningEvent):
+# Topic mastery thresholds (average score out of 100)
+WEAK_TOPIC_THRESHOLD = 60
+STRONG_TOPIC_THRESHOLD = 80
+TOPIC_STUDENTS_PAGE_SIZE = 100
+TOPIC_STUDENTS_MAX_PAGE_SIZE = 500
+TOPIC_MASTERY_BACKFILL_LOCK = 26026 # pg advisory lock key for backfill_topic_mastery
+
+# Daily test bank
+DAILY_TEST_SIZE = 5
+
+DAILY_TEST_CACHE_SIZE = 1024
+
+# (course_id, date) -> (DailyTest, {question_id: (correct_option, topic)}), or None if the course has no questions
+# Only today's and yesterday's tests (by server date) are kept, so the cache rotates with the date.
+_daily_test_cache = OrderedDict()
+_daily_test_lock = Lock()
+_NOT_CACHED = object()
+
+# Roll-number login cache: roll_no -> (expires_at, profile dict or None for "not found").
+# Bounded LRU; misses are cached briefly so unknown roll numbers don't hit the DB every time.
+STUDENT_CACHE_SIZE = 10000
+STUDENT_CACHE_TTL = 300 # seconds
+STUDENT_NEGATIVE_CACHE_TTL = 30 # seconds; bounds staleness for students created by other workers
+
+_student_cache = OrderedDict()
+_student_cache_lock = Lock()
+_student_cache_generation = 0 # bumped by invalidate_student; stale lookups skip their cache write
+
+def process_learning_event(db: Session, event_data: LearningEvent, commit: bool = True):
     """
     Ingests a learning event, updates daily summary, and recalculates progress.
+    With commit=False the event and summary are only flushed, so the caller can
+    commit (or roll back) them together with its own writes.
     """
     # 1. Check student existence
-    student = db.query(models.Student).filter(models.Student.id == event_data.student_id).first()
-    if not student:
-        student = models.Student(id=event_data.student_id)
-        db.add(student)
-        db.commit()
+    _ensure_student(db, event_data.student_id)
 
     # 2. Log API Event
     db_event = models.LearningEventDB(
@@ -27,12 +61,67 @@ def process_learning_event(db: Session, event_data: LearningEvent):
         attempt_number=event_data.attempt_number
     )
     db.add(db_event)
-    db.commit()
 
-    # 3. Update Daily Summary
-    update_daily_progress(db, event_data.student_id, event_data.date)
+    # 3. Fold the score into the topic mastery row (same commit as the event)
+    update_topic_mastery(db, event_data.student_id, event_data.topic, event_data.score)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+
+    # 4. Update Daily Summary
+    update_daily_progress(db, event_data.student_id, event_data.date, commit=commit)
+
+def _ensure_student(db: Session, student_id: str):
+    """
+    Creates a bare student row on first sight of a roll number.
+    """
+    student = db.query(models.Student).filter(models.Student.id == student_id).first()
+    if not student:
+        student = models.Student(id=student_id)
+        db.add(student)
+        db.commit()
+        invalidate_student(student_id)
+    return student
 
-def update_daily_progress(db: Session, student_id: str, day: date):
+def get_student_profile(db: Session, roll_no: str):
+    """
+    Looks up a student for login, served from memory when cached.
+    Returns a dict with id and name, or None if the roll number is unknown.
+    """
+    now = time.monotonic()
+    with _student_cache_lock:
+        entry = _student_cache.get(roll_no)
+        if entry is not None and entry[0] > now:
+            _student_cache.move_to_end(roll_no)
+            return entry[1]
+        generation = _student_cache_generation
+
+    student = db.query(models.Student).filter(models.Student.id == roll_no).first()
+    profile = {"id": student.id, "name": student.name} if student else None
+    ttl = STUDENT_CACHE_TTL if profile else STUDENT_NEGATIVE_CACHE_TTL
+
+    with _student_cache_lock:
+        # An invalidation landed while we were reading; our result may predate it
+        if generation != _student_cache_generation:
+            return profile
+        _student_cache[roll_no] = (now + ttl, profile)
+        _student_cache.move_to_end(roll_no)
+        if len(_student_cache) > STUDENT_CACHE_SIZE:
+            _student_cache.popitem(last=False)
+    return profile
+
+def invalidate_student(roll_no: str):
+    """
+    Drops any cached (positive or negative) login entry for a student, and
+    stops in-flight lookups that started before this call from caching.
+    """
+    global _student_cache_generation
+    with _student_cache_lock:
+        _student_cache.pop(roll_no, None)
+        _student_cache_generation += 1
+
+def update_daily_progress(db: Session, student_id: str, day: date, commit: bool = True):
     """
     Recalculates daily progress based on all events for that day.
     """
@@ -85,7 +174,10 @@ def update_daily_progress(db: Session, student_id: str, day: date):
         )
         db.add(summary)
     
-    db.commit()
+    if commit:
+        db.commit()
+    else:
+        db.flush()
 
 def calculate_streak(db: Session, student_id: str) -> StreakInfo:
     """
@@ -102,11 +194,17 @@ def calculate_streak(db: Session, student_id: str) -> StreakInfo:
         models.DailySummary.is_valid_day == True,
         models.DailySummary.date <= today
     ).order_by(desc(models.DailySummary.date)).all()
-    
-    if not summaries:
+
+    return _streak_from_dates([s.date for s in summaries], today)
+
+def _streak_from_dates(valid_dates, today: date) -> StreakInfo:
+    """
+    Strict streak from a student's valid days, most recent first.
+    """
+    if not valid_dates:
         return StreakInfo(current_streak=0, last_activity_date=None, is_active=False)
 
-    last_valid_date = summaries[0].date
+    last_valid_date = valid_dates[0]
     days_since_active = (today - last_valid_date).days
 
     # Strict Rules:
@@ -123,8 +221,8 @@ def calculate_streak(db: Session, student_id: str) -> StreakInfo:
     current_check_date = last_valid_date
     
     # Iterate backwards
-    for i in range(1, len(summaries)):
-        prev_date = summaries[i].date
+    for i in range(1, len(valid_dates)):
+        prev_date = valid_dates[i]
         expected_date = current_check_date - timedelta(days=1)
         
         if prev_date == expected_date:
@@ -153,7 +251,19 @@ def calculate_confidence(db: Session, student_id: str):
     avg = sum(scores) / len(scores)
     variance = sum((s - avg) ** 2 for s in scores) / len(scores)
     std_dev = math.sqrt(variance)
-    
+
+    times = [e.time_spent for e in events]
+    avg_time = sum(times) / len(times)
+    max_time = max(times)
+
+    summary_count = db.query(models.DailySummary).filter(models.DailySummary.student_id == student_id).count()
+
+    return _confidence_from_stats(std_dev, avg_time, max_time, summary_count)
+
+def _confidence_from_stats(std_dev: float, avg_time: float, max_time: int, summary_count: int):
+    """
+    Confidence rules applied to precomputed event statistics (at least 5 events).
+    """
     reason = []
     confidence_score = 3 # Start High
     
@@ -162,17 +272,12 @@ def calculate_confidence(db: Session, student_id: str):
         reason.append("High score volatility detected.")
         
     # Check for Spikes (Time)
-    times = [e.time_spent for e in events]
-    avg_time = sum(times) / len(times)
-    max_time = max(times)
-    
     if max_time > avg_time * 3 and max_time > 30:
         confidence_score -= 1
         reason.append("Unusual spike in time spent detected.")
         
     # Consistency Check
-    summaries = db.query(models.DailySummary).filter(models.DailySummary.student_id == student_id).all()
-    if len(summaries) < 3:
+    if summary_count < 3:
         confidence_score -= 1
         reason.append("Not enough daily history.")
         
@@ -183,42 +288,160 @@ def calculate_confidence(db: Session, student_id: str):
     else:
         return "Low", " ".join(reason)
 
+def _upsert(db: Session, table):
+    """
+    Dialect-specific INSERT supporting ON CONFLICT (Postgres in production, SQLite in tests).
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql_insert(table)
+    return sqlite_insert(table)
+
+def update_topic_mastery(db: Session, student_id: str, topic: str, score: int):
+    """
+    Folds a new score into the (student, topic) mastery row with a single atomic
+    upsert, so concurrent events neither lose increments nor collide on insert.
+    Does not commit; the caller commits alongside the event.
+    """
+    table = models.TopicMastery.__table__
+    stmt = _upsert(db, table).values(
+        student_id=student_id,
+        topic=topic,
+        event_count=1,
+        avg_score=float(score),
+        last_score=score,
+        trend=0.0,
+        updated_at=datetime.utcnow()
+    )
+    # SET expressions see the row as it was before this update
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.student_id, table.c.topic],
+        set_={
+            "event_count": table.c.event_count + 1,
+            "avg_score": table.c.avg_score + (stmt.excluded.avg_score - table.c.avg_score) / (table.c.event_count + 1),
+            "last_score": stmt.excluded.last_score,
+            "trend": stmt.excluded.avg_score - table.c.avg_score,
+            "updated_at": stmt.excluded.updated_at,
+        }
+    )
+    db.execute(stmt)
+
+def rebuild_topic_mastery(db: Session, student_id: str = None):
+    """
+    Recomputes mastery rows from the raw event log with one INSERT ... SELECT
+    grouped by (student, topic). Scoped to one student when student_id is given.
+    Used for backfills and bulk loads (e.g. seeding) that bypass process_learning_event.
+    """
+    events = models.LearningEventDB
+    latest = aliased(models.LearningEventDB)
+
+    delete_query = db.query(models.TopicMastery)
+    if student_id is not None:
+        delete_query = delete_query.filter(models.TopicMastery.student_id == student_id)
+    delete_query.delete(synchronize_session=False)
+
+    event_count = func.count(events.id)
+    score_sum = func.sum(events.score) * 1.0
+    last_score = select(latest.score).where(
+        latest.student_id == events.student_id,
+        latest.topic == events.topic
+    ).order_by(desc(latest.date), desc(latest.id)).limit(1).scalar_subquery()
+
+    # trend = last score minus the average of the scores before it
+    grouped = select(
+        events.student_id,
+        events.topic,
+        event_count,
+        score_sum / event_count,
+        last_score,
+        case(
+            (event_count > 1, last_score - (score_sum - last_score) / (event_count - 1)),
+            else_=0.0
+        ),
+        literal(datetime.utcnow(), DateTime)
+    ).group_by(events.student_id, events.topic)
+    if student_id is not None:
+        grouped = grouped.where(events.student_id == student_id)
+
+    db.execute(insert(models.TopicMastery).from_select(
+        ["student_id", "topic", "event_count", "avg_score", "last_score", "trend", "updated_at"],
+        grouped
+    ))
+    db.commit()
+
+def backfill_topic_mastery(db: Session):
+    """
+    One-shot backfill for databases that predate the topic_mastery table:
+    rebuilds it from learning_events if it is empty but events exist.
+    Run from migrate.py before serving traffic; concurrent ingest would race the rebuild.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Serialize overlapping migrate runs; released when the rebuild commits
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": TOPIC_MASTERY_BACKFILL_LOCK})
+    if db.query(models.TopicMastery.id).first() is not None:
+        return
+    if db.query(models.LearningEventDB.id).first() is None:
+        return
+    rebuild_topic_mastery(db)
+
 def get_student_analysis(db: Session, student_id: str):
     """
-    Analyzes weak and strong areas based on past quiz/practice scores.
+    Analyzes weak and strong areas from the precomputed topic mastery table.
     """
-    events = db.query(models.LearningEventDB).filter(
-        models.LearningEventDB.student_id == student_id
+    rows = db.query(models.TopicMastery.topic, models.TopicMastery.avg_score).filter(
+        models.TopicMastery.student_id == student_id
     ).all()
-    
-    topic_scores = {}
-    
-    for e in events:
-        if e.topic not in topic_scores:
-            topic_scores[e.topic] = []
-        topic_scores[e.topic].append(e.score)
-        
+
     strong_topics = []
     weak_topics = []
-    
-    for topic, scores in topic_scores.items():
-        avg = sum(scores) / len(scores)
-        if avg > 80:
+
+    for topic, avg in rows:
+        if avg > STRONG_TOPIC_THRESHOLD:
             strong_topics.append(topic)
-        elif avg < 60:
+        elif avg < WEAK_TOPIC_THRESHOLD:
             weak_topics.append(topic)
-            
+
     return weak_topics, strong_topics
 
+def get_weak_students(db: Session, topic: str, limit: int = TOPIC_STUDENTS_PAGE_SIZE, offset: int = 0):
+    """
+    Students whose average in a topic is below the weak threshold, weakest first.
+    """
+    return db.query(models.TopicMastery).filter(
+        models.TopicMastery.topic == topic,
+        models.TopicMastery.avg_score < WEAK_TOPIC_THRESHOLD
+    ).order_by(models.TopicMastery.avg_score, models.TopicMastery.student_id).offset(offset).limit(limit).all()
+
+def get_strong_students(db: Session, topic: str, limit: int = TOPIC_STUDENTS_PAGE_SIZE, offset: int = 0):
+    """
+    Students whose average in a topic is above the strong threshold, strongest first.
+    """
+    return db.query(models.TopicMastery).filter(
+        models.TopicMastery.topic == topic,
+        models.TopicMastery.avg_score > STRONG_TOPIC_THRESHOLD
+    ).order_by(desc(models.TopicMastery.avg_score), models.TopicMastery.student_id).offset(offset).limit(limit).all()
+
 def check_and_award_rewards(db: Session, student_id: str, current_streak: int):
     """
     Awards puzzle pieces for every 7 days of streak.
     """
     reward = db.query(models.Reward).filter(models.Reward.student_id == student_id).first()
     if not reward:
-        reward = models.Reward(student_id=student_id)
+        reward = models.Reward(student_id=student_id, puzzle_pieces=0, badges_unlocked=[])
         db.add(reward)
     
+    total_valid_days = db.query(models.DailySummary).filter(
+        models.DailySummary.student_id == student_id,
+        models.DailySummary.is_valid_day == True
+    ).count()
+
+    _apply_rewards(reward, current_streak, total_valid_days)
+    db.commit()
+    return reward
+
+def _apply_rewards(reward, current_streak: int, total_valid_days: int):
+    """
+    Updates badges and puzzle pieces on a Reward row. Does not commit.
+    """
     # Simple logic: 1 piece per week of streak
     # In a real system we'd track if "this week" was already claimed.
     # For hackathon, we calculate total pieces expected based on streak.
@@ -241,12 +464,286 @@ def check_and_award_rewards(db: Session, student_id: str, current_streak: int):
     # Let's auto-increment pieces if we detect a "new week" completion. 
     # Simpler: Just make it a function of total VALID days / 7.
     
-    total_valid_days = db.query(models.DailySummary).filter(
-        models.DailySummary.student_id == student_id,
-        models.DailySummary.is_valid_day == True
-    ).count()
-    
     reward.puzzle_pieces = total_valid_days // 7
+
+def get_batch_dashboard_stats(db: Session, student_ids):
+    """
+    Dashboard stats for many students at once. Runs one grouped query per
+    metric over the whole ID set, so query count does not grow with the batch.
+    Returns {student_id: DashboardStats}.
+    """
+    student_ids = list(dict.fromkeys(student_ids))
+    today = date.today()
+
+    students = {
+        s.id: s for s in db.query(models.Student).filter(models.Student.id.in_(student_ids)).all()
+    }
+
+    summaries = {sid: [] for sid in student_ids}
+    for s in db.query(models.DailySummary).filter(
+        models.DailySummary.student_id.in_(student_ids)
+    ).order_by(models.DailySummary.student_id, models.DailySummary.date).all():
+        summaries[s.student_id].append(s)
+
+    # Per-student event statistics for confidence. Variance is two-pass like
+    # calculate_confidence: a grouped mean first, then the mean squared deviation,
+    # so results near the volatility cutoff match the single-student dashboard.
+    events = models.LearningEventDB
+    means = db.query(
+        events.student_id,
+        (cast(func.sum(events.score), Float) / cast(func.count(events.id), Float)).label("mean")
+    ).filter(
+        events.student_id.in_(student_ids)
+    ).group_by(events.student_id).subquery()
+    deviation = events.score - means.c.mean
+
+    event_stats = {
+        row.student_id: row for row in db.query(
+            events.student_id,
+            func.count(events.id).label("count"),
+            (func.sum(deviation * deviation) / cast(func.count(events.id), Float)).label("variance"),
+            func.avg(events.time_spent).label("avg_time"),
+            func.max(events.time_spent).label("max_time")
+        ).join(
+            means, means.c.student_id == events.student_id
+        ).group_by(events.student_id).all()
+    }
+
+    activity_dist = {sid: [] for sid in student_ids}
+    for sid, atype, count in db.query(
+        models.LearningEventDB.student_id,
+        models.LearningEventDB.activity_type,
+        func.count(models.LearningEventDB.id)
+    ).filter(
+        models.LearningEventDB.student_id.in_(student_ids)
+    ).group_by(models.LearningEventDB.student_id, models.LearningEventDB.activity_type).all():
+        activity_dist[sid].append(schemas.ActivityValidation(activity_type=atype, count=count))
+
+    rewards = {
+        r.student_id: r for r in db.query(models.Reward).filter(models.Reward.student_id.in_(student_ids)).all()
+    }
+
+    results = {}
+    new_rewards = []
+    for sid in student_ids:
+        student_summaries = summaries[sid]
+        valid_dates = [s.date for s in reversed(student_summaries) if s.is_valid_day and s.date <= today]
+        streak_info = _streak_from_dates(valid_dates, today)
+
+        stats = event_stats.get(sid)
+        if not stats or stats.count < 5:
+            conf_level, conf_reason = "Low", "Insufficient data points (less than 5 events)."
+        else:
+            std_dev = math.sqrt(float(stats.variance))
+            conf_level, conf_reason = _confidence_from_stats(
+                std_dev, float(stats.avg_time), stats.max_time, len(student_summaries)
+            )
+
+        # Rewards are only tracked for students that exist.
+        # Missing rows are collected and bulk-inserted in one statement below.
+        reward = rewards.get(sid)
+        if sid in students:
+            if not reward:
+                reward = models.Reward(student_id=sid, puzzle_pieces=0, badges_unlocked=[])
+                new_rewards.append(reward)
+            total_valid_days = sum(1 for s in student_summaries if s.is_valid_day)
+            _apply_rewards(reward, streak_info.current_streak, total_valid_days)
+
+        student = students.get(sid)
+        results[sid] = schemas.DashboardStats(
+            student=schemas.Student.model_validate(student) if student else None,
+            daily_progress=[
+                schemas.DailyProgress(
+                    date=s.date,
+                    total_time=s.total_time,
+                    avg_score=s.avg_score,
+                    progress_score=s.progress_score,
+                    is_valid_day=s.is_valid_day
+                ) for s in student_summaries
+            ],
+            streak=streak_info,
+            confidence_level=conf_level,
+            confidence_reason=conf_reason,
+            activity_distribution=activity_dist[sid],
+            reward=schemas.RewardInfo.model_validate(reward) if reward else None
+        )
+
+    if new_rewards:
+        db.execute(insert(models.Reward), [
+            {"student_id": r.student_id, "puzzle_pieces": r.puzzle_pieces, "badges_unlocked": r.badges_unlocked}
+            for r in new_rewards
+        ])
     db.commit()
-    return reward
+    return results
+
+def _pick_daily_questions(db: Session, course_id, day: date):
+    """
+    Deterministically samples the day's question IDs from the current bank
+    for a course (or the whole bank when course_id is None).
+    """
+    query = db.query(models.TestQuestion.id)
+    if course_id is not None:
+        query = query.filter(models.TestQuestion.course_id == course_id)
+    question_ids = [qid for (qid,) in query.order_by(models.TestQuestion.id).all()]
+
+    rng = random.Random(f"{course_id}:{day.isoformat()}")
+    return rng.sample(question_ids, min(DAILY_TEST_SIZE, len(question_ids)))
+
+def _build_daily_test(db: Session, course_id, day: date):
+    """
+    Loads the day's test for a course from daily_tests, generating and storing
+    it on first use. Once stored, the selection never changes, so every worker
+    and every cache miss serves (and scores) the same questions.
+    """
+    course_key = course_id or 0
+    stored = db.query(models.DailyTestSelection).filter(
+        models.DailyTestSelection.course_id == course_key,
+        models.DailyTestSelection.date == day
+    ).first()
+
+    if stored:
+        question_ids = stored.question_ids
+    else:
+        question_ids = _pick_daily_questions(db, course_id, day)
+        if not question_ids:
+            return None
+
+        db.add(models.DailyTestSelection(course_id=course_key, date=day, question_ids=question_ids))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another worker stored the day's test first; serve theirs
+            db.rollback()
+            question_ids = db.query(models.DailyTestSelection.question_ids).filter(
+                models.DailyTestSelection.course_id == course_key,
+                models.DailyTestSelection.date == day
+            ).scalar()
+
+    by_id = {
+        q.id: q for q in db.query(models.TestQuestion).filter(models.TestQuestion.id.in_(question_ids)).all()
+    }
+    # Questions deleted from the bank after the test was generated drop out
+    picked = [by_id[qid] for qid in question_ids if qid in by_id]
+    if not picked:
+        return None
+
+    test = DailyTest(
+        course_id=course_id,
+        date=day,
+        questions=[
+            DailyTestQuestion(id=q.id, topic=q.topic, question=q.question, options=q.options)
+            for q in picked
+        ]
+    )
+    answer_key = {q.id: (q.correct_option, q.topic) for q in picked}
+    return test, answer_key
+
+def _daily_test_window():
+    """
+    Dates a daily test can be served or submitted for: today, plus yesterday
+    so tests started just before midnight can still be submitted.
+    """
+    today = date.today()
+    return today - timedelta(days=1), today
+
+def _get_cached_daily_test(db: Session, course_id, day: date):
+    key = (course_id, day)
+    entry = _daily_test_cache.get(key, _NOT_CACHED)
+    if entry is not _NOT_CACHED:
+        return entry
+
+    # Build outside the lock so misses for different courses don't serialize.
+    # Racing builders read the same stored daily_tests row.
+    # Courses with no questions are cached as None.
+    entry = _build_daily_test(db, course_id, day)
+
+    with _daily_test_lock:
+        # Rotate on the server date: drop anything outside today/yesterday
+        oldest, today = _daily_test_window()
+        for stale in [k for k in _daily_test_cache if not oldest <= k[1] <= today]:
+            del _daily_test_cache[stale]
+
+        if oldest <= day <= today:
+            _daily_test_cache[key] = entry
+            if len(_daily_test_cache) > DAILY_TEST_CACHE_SIZE:
+                _daily_test_cache.popitem(last=False)
+    return entry
 
+def get_daily_test(db: Session, course_id=None):
+    """
+    Returns today's test for a course, served from the per-(course, date) cache.
+    """
+    entry = _get_cached_daily_test(db, course_id, date.today())
+    return entry[0] if entry else None
+
+class DuplicateSubmissionError(ValueError):
+    """Raised when a student resubmits a daily test they already took."""
+
+def score_daily_test(db: Session, submission) -> DailyTestResult:
+    """
+    Scores a daily test submission against the server-side answer key and
+    records one learning event per topic covered by the test.
+    Only today's (or yesterday's) test can be submitted.
+    """
+    oldest, today = _daily_test_window()
+    if not oldest <= submission.date <= today:
+        raise ValueError("Only today's daily test can be submitted")
+
+    entry = _get_cached_daily_test(db, submission.course_id, submission.date)
+    if entry is None:
+        raise ValueError("No daily test available for this course and date")
+    _, answer_key = entry
+
+    unknown = set(submission.answers) - set(answer_key)
+    if unknown:
+        raise ValueError(f"Questions not part of this test: {sorted(unknown)}")
+
+    topic_results = {}
+    correct = 0
+    for question_id, (correct_option, topic) in answer_key.items():
+        is_correct = submission.answers.get(question_id) == correct_option
+        correct += is_correct
+        hits, total = topic_results.get(topic, (0, 0))
+        topic_results[topic] = (hits + is_correct, total + 1)
+    score = round(correct / len(answer_key) * 100)
+
+    # One attempt per (student, course, date); the unique constraint settles races.
+    # The attempt and its events commit together, and the answer key is only
+    # returned once they have.
+    _ensure_student(db, submission.student_id)
+    db.add(models.DailyTestAttempt(
+        student_id=submission.student_id,
+        course_id=submission.course_id or 0,
+        date=submission.date,
+        score=score
+    ))
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise DuplicateSubmissionError("Daily test already submitted")
+
+    # Spread the time across topics so the day's total stays accurate
+    time_per_topic = max(submission.time_spent // len(topic_results), 1)
+    try:
+        for topic, (hits, total) in topic_results.items():
+            process_learning_event(db, LearningEvent(
+                student_id=submission.student_id,
+                date=submission.date,
+                activity_type=ActivityType.TEST,
+                topic=topic,
+                score=round(hits / total * 100),
+                time_spent=time_per_topic,
+                attempt_number=1
+            ), commit=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return DailyTestResult(
+        score=score,
+        correct=correct,
+        total=len(answer_key),
+        correct_options={qid: opt for qid, (opt, _) in answer_key.items()}
+    )
@@ -1,16 +1,27 @@
-from fastapi import FastAPI, Depends, HTTPException
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from fastapi import FastAPI, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from .database import engine, get_db, Base
+from .database import get_db, init_db
 from . import models, logic, db_models
+from .admission import ingest_gate
 from fastapi.middleware.cors import CORSMiddleware
+import os
 
-# Initialize DB
-db_models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema setup happens at server startup, not at import.
+    # Data backfills are not run here; use `python migrate.py` once per deploy.
+    # Set SKIP_DB_INIT=1 when migrations are run separately.
+    if os.getenv("SKIP_DB_INIT") != "1":
+        init_db()
+    yield
 
 app = FastAPI(
     title="Student Progress Tracker",
     description="Backend for Build2Break Hackathon Project",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Enable CORS for Frontend
@@ -26,11 +37,25 @@ app.add_middleware(
 def read_root():
     return {"message": "System is running", "status": "healthy"}
 
-@app.post("/events")
+# Admission control runs as async dependencies on the event loop, declared before
+# get_db, so shed requests never take a threadpool slot or a DB session.
+# Parameter names match the endpoint's body parameter so the body is parsed once.
+
+async def admit_event(event: models.LearningEvent):
+    with ingest_gate.admit(event.student_id):
+        yield
+
+async def admit_test_submission(data: models.DailyTestSubmission):
+    # Charged at its real write cost: the attempt plus up to one event per question
+    with ingest_gate.admit(data.student_id, cost=logic.DAILY_TEST_SIZE + 1):
+        yield
+
+@app.post("/events", dependencies=[Depends(admit_event)])
 def ingest_event(event: models.LearningEvent, db: Session = Depends(get_db)):
     """
     Ingest a raw learning event. 
     Triggers validation, processing, and progress updates.
+    Subject to admission control: 429/503 with Retry-After when saturated.
     """
     try:
         logic.process_learning_event(db, event)
@@ -38,9 +63,16 @@ def ingest_event(event: models.LearningEvent, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.get("/metrics/ingest")
+def get_ingest_metrics():
+    """
+    Admission control counters: in-flight ingest requests and shed counts.
+    """
+    return ingest_gate.metrics()
+
 @app.get("/auth/student/{roll_no}", response_model=models.Student)
 def login_student(roll_no: str, db: Session = Depends(get_db)):
-    student = db.query(db_models.Student).filter(db_models.Student.id == roll_no).first()
+    student = logic.get_student_profile(db, roll_no)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     return student
@@ -51,27 +83,48 @@ def get_student_courses(student_id: str, db: Session = Depends(get_db)):
     courses = [e.course for e in enrollments]
     return courses
 
-@app.get("/test/daily")
-def get_daily_test():
-    # Mock Daily Test
-    return {
-        "id": 101,
-        "question": "What is the complexity of Binary Search?",
-        "options": ["O(n)", "O(log n)", "O(n^2)", "O(1)"],
-        "correct_option": 1
-    }
-
-@app.post("/test/submit")
-def submit_test_score(data: models.LearningEvent, db: Session = Depends(get_db)):
-    # Re-use ingestion logic but mark as test
-    logic.process_learning_event(db, data)
-    return {"status": "success", "message": "Test Submitted"}
+@app.get("/test/daily", response_model=models.DailyTest)
+def get_daily_test(course_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """
+    Today's test for a course (or the whole question bank), cached per (course, date).
+    """
+    test = logic.get_daily_test(db, course_id)
+    if not test:
+        raise HTTPException(status_code=404, detail="No daily test available")
+    return test
+
+@app.post("/test/submit", response_model=models.DailyTestResult, dependencies=[Depends(admit_test_submission)])
+def submit_test_score(data: models.DailyTestSubmission, db: Session = Depends(get_db)):
+    try:
+        return logic.score_daily_test(db, data)
+    except logic.DuplicateSubmissionError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/analysis/{student_id}")
 def get_analysis_report(student_id: str, db: Session = Depends(get_db)):
     weak, strong = logic.get_student_analysis(db, student_id)
     return {"weak_topics": weak, "strong_topics": strong}
 
+@app.get("/topics/{topic}/weak-students", response_model=list[models.TopicMasteryInfo])
+def get_weak_students(
+    topic: str,
+    limit: int = Query(logic.TOPIC_STUDENTS_PAGE_SIZE, ge=1, le=logic.TOPIC_STUDENTS_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    return logic.get_weak_students(db, topic, limit=limit, offset=offset)
+
+@app.get("/topics/{topic}/strong-students", response_model=list[models.TopicMasteryInfo])
+def get_strong_students(
+    topic: str,
+    limit: int = Query(logic.TOPIC_STUDENTS_PAGE_SIZE, ge=1, le=logic.TOPIC_STUDENTS_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    return logic.get_strong_students(db, topic, limit=limit, offset=offset)
+
 @app.get("/student/{student_id}/dashboard", response_model=models.DashboardStats)
 def get_dashboard_stats(student_id: str, db: Session = Depends(get_db)):
     """
@@ -127,3 +180,11 @@ def get_dashboard_stats(student_id: str, db: Session = Depends(get_db)):
         activity_distribution=activity_dist,
         reward=models.RewardInfo.model_validate(reward_info) if reward_info else None
     )
+
+@app.post("/dashboards/batch", response_model=Dict[str, models.DashboardStats])
+def get_batch_dashboard_stats(request: models.BatchDashboardRequest, db: Session = Depends(get_db)):
+    """
+    Dashboard data for many students, keyed by student ID.
+    Uses a fixed number of set-based queries regardless of batch size.
+    """
+    return logic.get_batch_dashboard_stats(db, request.student_ids)
@@ -61,11 +61,29 @@ class RewardInfo(BaseModel):
     class Config:
         from_attributes = True
 
-class DailyTest(BaseModel):
+class DailyTestQuestion(BaseModel):
     id: int
+    topic: str
     question: str
     options: List[str]
-    correct_option: int
+
+class DailyTest(BaseModel):
+    course_id: Optional[int]
+    date: dt_date
+    questions: List[DailyTestQuestion]
+
+class DailyTestSubmission(BaseModel):
+    student_id: str = Field(..., description="Unique identifier for the student")
+    course_id: Optional[int] = Field(None, description="Course the test was served for")
+    date: dt_date = Field(..., description="Date the test was served for (YYYY-MM-DD)")
+    answers: Dict[int, int] = Field(..., description="Question id -> selected option index")
+    time_spent: int = Field(..., gt=0, description="Time spent in minutes")
+
+class DailyTestResult(BaseModel):
+    score: int
+    correct: int
+    total: int
+    correct_options: Dict[int, int]
 
 # --- Response Models ---
 
@@ -85,6 +103,16 @@ class ActivityValidation(BaseModel):
     activity_type: str
     count: int
 
+class TopicMasteryInfo(BaseModel):
+    student_id: str
+    topic: str
+    event_count: int
+    avg_score: float
+    last_score: Optional[int]
+    trend: float
+    class Config:
+        from_attributes = True
+
 class DashboardStats(BaseModel):
     student: Optional[Student]
     daily_progress: list[DailyProgress]
@@ -93,3 +121,6 @@ class DashboardStats(BaseModel):
     confidence_reason: str
     activity_distribution: list[ActivityValidation]
     reward: Optional[RewardInfo]
+
+class BatchDashboardRequest(BaseModel):
+    student_ids: List[str] = Field(..., min_length=1, max_length=200, description="Students to build dashboards for")
@@ -0,0 +1,48 @@
+"""
+Measures cold-start cost of the backend.
+
+    python bench_startup.py            # import time only (no database needed)
+    python bench_startup.py --startup  # also time lifespan startup (schema setup)
+"""
+import subprocess
+import sys
+import time
+
+RUNS = 5
+
+IMPORT_SNIPPET = """
+import time
+t = time.perf_counter()
+import app.main
+from app import database
+print(time.perf_counter() - t, database._engine is None)
+"""
+
+STARTUP_SNIPPET = """
+import asyncio, time
+from app.main import app, lifespan
+async def run():
+    t = time.perf_counter()
+    async with lifespan(app):
+        print(time.perf_counter() - t)
+asyncio.run(run())
+"""
+
+def run_snippet(snippet):
+    out = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, check=True)
+    return out.stdout.split()
+
+def bench(label, snippet):
+    timings = []
+    for _ in range(RUNS):
+        fields = run_snippet(snippet)
+        timings.append(float(fields[0]))
+    timings.sort()
+    print(f"{label}: median {timings[len(timings) // 2] * 1000:.1f} ms, best {timings[0] * 1000:.1f} ms ({RUNS} runs)")
+    return fields
+
+if __name__ == "__main__":
+    fields = bench("import app.main", IMPORT_SNIPPET)
+    print(f"engine untouched after import: {fields[1]}")
+    if "--startup" in sys.argv:
+        bench("lifespan startup", STARTUP_SNIPPET)
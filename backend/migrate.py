@@ -0,0 +1,21 @@
+from app.database import SessionLocal, init_db
+from app import logic
+
+def migrate():
+    """
+    Explicit, run-once schema and data migration. Run before starting the
+    app workers (e.g. `python migrate.py && uvicorn app.main:app`).
+    """
+    print("Creating tables...")
+    init_db()
+
+    db = SessionLocal()
+    try:
+        print("Backfilling topic mastery...")
+        logic.backfill_topic_mastery(db)
+    finally:
+        db.close()
+    print("Migration complete!")
+
+if __name__ == "__main__":
+    migrate()
@@ -1,13 +1,13 @@
 from sqlalchemy.orm import Session
 from app import db_models as models
-from app.database import SessionLocal, engine
+from app.database import SessionLocal, init_db
+from app import logic
 from datetime import date, timedelta
 import random
 
-# Init DB
-models.Base.metadata.create_all(bind=engine)
-
 def seed_database():
+    # Init DB
+    init_db()
     db = SessionLocal()
     
     # 1. Create Demo Student
@@ -64,7 +64,46 @@ def seed_database():
             )
             db.add(content)
             
-    # 3. Create Fake History (Last 30 days)
+    db.commit()
+
+    # 3. Create Daily Test Question Bank
+    question_bank = {
+        "Advanced Python": [
+            ("Python", "Which keyword defines a coroutine?", ["def", "async def", "yield", "lambda"], 1),
+            ("Python", "What does the GIL limit?", ["Memory usage", "Parallel bytecode execution", "File I/O", "Imports"], 1),
+            ("Python", "Which call runs an asyncio event loop until a coroutine finishes?", ["asyncio.run", "asyncio.sleep", "asyncio.wait_for", "asyncio.Queue"], 0),
+            ("Python", "What is the type of `{}`?", ["set", "list", "dict", "tuple"], 2),
+        ],
+        "Data Structures": [
+            ("Algorithms", "What is the complexity of Binary Search?", ["O(n)", "O(log n)", "O(n^2)", "O(1)"], 1),
+            ("Algorithms", "Which traversal uses a queue?", ["DFS", "BFS", "Inorder", "Postorder"], 1),
+            ("Trees", "Max children of a node in a binary tree?", ["1", "2", "3", "Unbounded"], 1),
+            ("Graphs", "Dijkstra's algorithm fails with...", ["Cycles", "Negative edges", "Dense graphs", "Undirected edges"], 1),
+        ],
+        "System Design": [
+            ("SQL", "Which index type best serves range queries?", ["Hash", "B-tree", "Bitmap", "None"], 1),
+            ("Docker", "Which file describes how to build an image?", ["compose.yml", "Dockerfile", "Makefile", ".env"], 1),
+            ("SQL", "What does a composite index on (a, b) NOT help with?", ["WHERE a = ?", "WHERE a = ? AND b = ?", "WHERE b = ?", "ORDER BY a, b"], 2),
+        ],
+    }
+
+    for title, questions in question_bank.items():
+        course = db.query(models.Course).filter(models.Course.title == title).first()
+        if not course or course.questions:
+            continue
+        print(f"Adding Test Questions: {title}")
+        content = course.content[0] if course.content else None
+        for topic, question, options, correct_option in questions:
+            db.add(models.TestQuestion(
+                course_id=course.id,
+                content_id=content.id if content else None,
+                topic=topic,
+                question=question,
+                options=options,
+                correct_option=correct_option
+            ))
+
+    # 4. Create Fake History (Last 30 days)
     # simulate some gaps and streaks
     today = date.today()
     print("Generating History...")
@@ -104,6 +143,9 @@ def seed_database():
         db.add(summary)
         
     db.commit()
+
+    # Events above were inserted directly, so derive mastery from them
+    logic.rebuild_topic_mastery(db, student_id)
     print("Database Seeded Successfully!")
     db.close()
 
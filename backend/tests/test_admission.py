@@ -0,0 +1,128 @@
+import pytest
+from fastapi import HTTPException
+from app.admission import TokenBucket, AdmissionController
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    def __call__(self):
+        return self.now
+
+def test_token_bucket_refills_over_time():
+    """Test bucket allows a burst, then refills at its rate"""
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+
+    assert bucket.try_acquire()[0]
+    assert bucket.try_acquire()[0]
+    ok, wait = bucket.try_acquire()
+    assert not ok
+    assert wait == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_acquire()[0]
+
+def test_per_student_limit_returns_429():
+    """Test a single noisy student is rate limited without affecting others"""
+    gate = AdmissionController(global_rate=100, global_burst=100, student_rate=1, student_burst=2,
+                               max_in_flight=10, clock=FakeClock())
+    for _ in range(2):
+        with gate.admit("noisy"):
+            pass
+
+    with pytest.raises(HTTPException) as exc:
+        gate.acquire("noisy")
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "1"
+
+    with gate.admit("quiet"):
+        pass
+    assert gate.metrics()["shed"]["student_rate_limited"] == 1
+
+def test_in_flight_limit_returns_503():
+    """Test requests are shed once the in-flight limit is reached"""
+    gate = AdmissionController(global_rate=100, global_burst=100, student_rate=100, student_burst=100,
+                               max_in_flight=1, clock=FakeClock())
+    with gate.admit("a"):
+        assert gate.metrics()["in_flight"] == 1
+        with pytest.raises(HTTPException) as exc:
+            gate.acquire("b")
+        assert exc.value.status_code == 503
+
+    assert gate.metrics()["in_flight"] == 0
+    assert gate.metrics()["shed"]["saturated"] == 1
+
+def test_global_limit_returns_503():
+    """Test the global bucket caps total ingest across students"""
+    gate = AdmissionController(global_rate=1, global_burst=1, student_rate=100, student_burst=100,
+                               max_in_flight=10, clock=FakeClock())
+    with gate.admit("a"):
+        pass
+    with pytest.raises(HTTPException) as exc:
+        gate.acquire("b")
+    assert exc.value.status_code == 503
+    assert "Retry-After" in exc.value.headers
+
+def test_global_rejection_does_not_charge_student():
+    """Test students keep their tokens while the global bucket sheds load"""
+    clock = FakeClock()
+    gate = AdmissionController(global_rate=1, global_burst=1, student_rate=1, student_burst=1,
+                               max_in_flight=10, clock=clock)
+    with gate.admit("storm"):
+        pass
+    for _ in range(3):
+        with pytest.raises(HTTPException) as exc:
+            gate.acquire("student")
+        assert exc.value.status_code == 503
+
+    clock.now += 1
+    with gate.admit("student"):
+        pass
+
+def test_student_rejection_refunds_global_token():
+    """Test a rate-limited student doesn't consume global capacity"""
+    gate = AdmissionController(global_rate=1, global_burst=2, student_rate=1, student_burst=1,
+                               max_in_flight=10, clock=FakeClock())
+    with gate.admit("noisy"):
+        pass
+    with pytest.raises(HTTPException):
+        gate.acquire("noisy")
+    with gate.admit("other"):
+        pass
+
+def test_shed_requests_never_open_a_session(monkeypatch):
+    """Test admission runs before get_db, so rejected ingest never reaches the threadpool"""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    from app import main, database
+
+    opened = []
+    def fake_db():
+        opened.append(True)
+        yield None
+
+    monkeypatch.setattr(main, "ingest_gate", AdmissionController(max_in_flight=0))
+    main.app.dependency_overrides[database.get_db] = fake_db
+    try:
+        response = TestClient(main.app).post("/events", json={
+            "student_id": "storm", "date": "2026-01-01", "activity_type": "quiz",
+            "topic": "SQL", "score": 50, "time_spent": 5, "attempt_number": 1
+        })
+    finally:
+        main.app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert opened == []
+
+def test_requests_are_charged_by_cost():
+    """Test a multi-event request drains the buckets by its cost"""
+    gate = AdmissionController(global_rate=100, global_burst=100, student_rate=1, student_burst=10,
+                               max_in_flight=10, clock=FakeClock())
+    with gate.admit("taker", cost=6):
+        pass
+    with pytest.raises(HTTPException) as exc:
+        gate.acquire("taker", cost=6)
+    assert exc.value.status_code == 429
+    assert exc.value.headers["Retry-After"] == "2"
+    assert gate.global_bucket.tokens == 94
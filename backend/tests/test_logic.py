@@ -109,3 +109,348 @@ def test_no_grace_period(db):
     streak_info = logic.calculate_streak(db, student_id)
     assert streak_info.current_streak == 0
     assert streak_info.is_active == False
+
+def test_topic_mastery_tracks_running_average(db):
+    """Test mastery row keeps count, average, last score and trend per topic"""
+    student_id = "mastery_student"
+
+    for score in [40, 60, 80]:
+        logic.process_learning_event(db, LearningEvent(
+            student_id=student_id,
+            date=date.today(),
+            activity_type=ActivityType.QUIZ,
+            topic="SQL", score=score, time_spent=10, attempt_number=1
+        ))
+
+    mastery = db.query(models.TopicMastery).filter(
+        models.TopicMastery.student_id == student_id,
+        models.TopicMastery.topic == "SQL"
+    ).one()
+    assert mastery.event_count == 3
+    assert mastery.avg_score == 60
+    assert mastery.last_score == 80
+    assert mastery.trend == 30
+
+def test_weak_and_strong_students_per_topic(db):
+    """Test weak/strong classification from the mastery table"""
+    for student_id, score in [("weak_1", 30), ("mid_1", 70), ("strong_1", 95)]:
+        logic.process_learning_event(db, LearningEvent(
+            student_id=student_id,
+            date=date.today(),
+            activity_type=ActivityType.QUIZ,
+            topic="SQL", score=score, time_spent=10, attempt_number=1
+        ))
+
+    assert [m.student_id for m in logic.get_weak_students(db, "SQL")] == ["weak_1"]
+    assert [m.student_id for m in logic.get_strong_students(db, "SQL")] == ["strong_1"]
+    assert logic.get_student_analysis(db, "weak_1") == (["SQL"], [])
+    assert logic.get_student_analysis(db, "strong_1") == ([], ["SQL"])
+
+def test_weak_students_are_paginated(db):
+    """Test weak student listing honours limit/offset in weakest-first order"""
+    for n in range(5):
+        logic.process_learning_event(db, LearningEvent(
+            student_id=f"page_{n}",
+            date=date.today(),
+            activity_type=ActivityType.QUIZ,
+            topic="SQL", score=10 + n, time_spent=10, attempt_number=1
+        ))
+
+    first = logic.get_weak_students(db, "SQL", limit=2)
+    second = logic.get_weak_students(db, "SQL", limit=2, offset=2)
+    assert [m.student_id for m in first] == ["page_0", "page_1"]
+    assert [m.student_id for m in second] == ["page_2", "page_3"]
+
+def test_topic_mastery_backfill_matches_incremental(db):
+    """Test the set-based backfill reproduces incrementally maintained rows"""
+    for student_id, topic, score in [("bf_1", "SQL", 40), ("bf_1", "SQL", 90), ("bf_1", "SQL", 65),
+                                     ("bf_1", "Python", 70), ("bf_2", "SQL", 20)]:
+        logic.process_learning_event(db, LearningEvent(
+            student_id=student_id,
+            date=date.today(),
+            activity_type=ActivityType.QUIZ,
+            topic=topic, score=score, time_spent=10, attempt_number=1
+        ))
+
+    def snapshot():
+        rows = db.query(models.TopicMastery).order_by(models.TopicMastery.student_id, models.TopicMastery.topic).all()
+        return [(m.student_id, m.topic, m.event_count, round(m.avg_score, 6), m.last_score, round(m.trend, 6)) for m in rows]
+
+    incremental = snapshot()
+    db.query(models.TopicMastery).delete()
+    db.commit()
+
+    logic.backfill_topic_mastery(db)
+    assert snapshot() == incremental
+
+    # No-op once the table has rows
+    logic.backfill_topic_mastery(db)
+    assert snapshot() == incremental
+
+def _seed_questions(db, course_id, count):
+    db.add(models.Course(id=course_id, title=f"Course {course_id}", description="", faculty_name="", schedule={}))
+    for i in range(count):
+        db.add(models.TestQuestion(
+            course_id=course_id,
+            topic="SQL" if i % 2 else "Python",
+            question=f"Question {i}",
+            options=["a", "b", "c", "d"],
+            correct_option=i % 4
+        ))
+    db.commit()
+
+def _freeze_today(monkeypatch, day):
+    class FrozenDate(date):
+        @classmethod
+        def today(cls):
+            return day
+    monkeypatch.setattr(logic, "date", FrozenDate)
+
+def test_daily_test_is_deterministic_and_cached(db, monkeypatch):
+    """Test the same (course, date) yields the same cached test, rotating with the server date"""
+    logic._daily_test_cache.clear()
+    _seed_questions(db, 1, 12)
+    day = date(2026, 1, 15)
+    _freeze_today(monkeypatch, day)
+
+    test = logic.get_daily_test(db, 1)
+    assert len(test.questions) == logic.DAILY_TEST_SIZE
+    assert (1, day) in logic._daily_test_cache
+
+    logic._daily_test_cache.clear()
+    assert logic.get_daily_test(db, 1) == test
+
+    _freeze_today(monkeypatch, day + timedelta(days=3))
+    assert logic.get_daily_test(db, 1) is not None
+    assert (1, day) not in logic._daily_test_cache
+
+def test_daily_test_survives_bank_changes_and_cache_loss(db):
+    """Test a served test is scored as served even after new questions and a cache miss"""
+    from app.models import DailyTestSubmission
+    logic._daily_test_cache.clear()
+    _seed_questions(db, 1, 6)
+
+    served = logic.get_daily_test(db, 1)
+    db.add(models.TestQuestion(course_id=1, topic="SQL", question="Late addition", options=["a", "b"], correct_option=0))
+    db.commit()
+    logic._daily_test_cache.clear()
+
+    assert logic.get_daily_test(db, 1) == served
+    key = {q.id: q.correct_option for q in db.query(models.TestQuestion).all()}
+    result = logic.score_daily_test(db, DailyTestSubmission(
+        student_id="stable_taker", course_id=1, date=date.today(),
+        answers={q.id: key[q.id] for q in served.questions}, time_spent=5
+    ))
+    assert result.score == 100
+
+def test_daily_test_caches_empty_courses(db):
+    """Test a course with no questions is cached as a miss instead of re-queried"""
+    logic._daily_test_cache.clear()
+    assert logic.get_daily_test(db, 42) is None
+    assert logic._daily_test_cache[(42, date.today())] is None
+
+    _seed_questions(db, 42, 4)
+    assert logic.get_daily_test(db, 42) is None
+
+def test_daily_test_failed_events_roll_back_attempt(db, monkeypatch):
+    """Test a failure while recording events leaves no attempt, so the student can retry"""
+    from app.models import DailyTestSubmission
+    logic._daily_test_cache.clear()
+    _seed_questions(db, 1, 4)
+    submission = DailyTestSubmission(
+        student_id="retry_taker", course_id=1, date=date.today(), answers={}, time_spent=5
+    )
+
+    real_update = logic.update_topic_mastery
+    calls = []
+    def flaky_update(db, student_id, topic, score):
+        calls.append(topic)
+        if len(calls) == 2:
+            raise RuntimeError("database hiccup")
+        return real_update(db, student_id, topic, score)
+    monkeypatch.setattr(logic, "update_topic_mastery", flaky_update)
+
+    with pytest.raises(RuntimeError):
+        logic.score_daily_test(db, submission)
+    assert db.query(models.DailyTestAttempt).count() == 0
+    assert db.query(models.LearningEventDB).filter(
+        models.LearningEventDB.student_id == "retry_taker"
+    ).count() == 0
+
+    monkeypatch.setattr(logic, "update_topic_mastery", real_update)
+    assert logic.score_daily_test(db, submission).total == 4
+
+def test_daily_test_rejects_other_dates(db):
+    """Test submissions for dates outside today/yesterday are rejected and not cached"""
+    from app.models import DailyTestSubmission
+    logic._daily_test_cache.clear()
+    _seed_questions(db, 1, 4)
+    logic.get_daily_test(db, 1)
+
+    for day in [date(2099, 1, 1), date.today() - timedelta(days=5)]:
+        with pytest.raises(ValueError):
+            logic.score_daily_test(db, DailyTestSubmission(
+                student_id="time_traveller", course_id=1, date=day, answers={}, time_spent=5
+            ))
+
+    assert list(logic._daily_test_cache) == [(1, date.today())]
+    assert db.query(models.LearningEventDB).filter(
+        models.LearningEventDB.student_id == "time_traveller"
+    ).count() == 0
+
+def test_daily_test_scored_server_side(db):
+    """Test submissions are scored against the stored answer key"""
+    from app.models import DailyTestSubmission
+    logic._daily_test_cache.clear()
+    _seed_questions(db, 1, 4)
+    day = date.today()
+
+    test = logic.get_daily_test(db, 1)
+    key = {q.id: q.correct_option for q in db.query(models.TestQuestion).all()}
+    answers = {q.id: key[q.id] for q in test.questions}
+    wrong_id = test.questions[0].id
+    answers[wrong_id] = (key[wrong_id] + 1) % 4
+
+    result = logic.score_daily_test(db, DailyTestSubmission(
+        student_id="test_taker", course_id=1, date=day, answers=answers, time_spent=10
+    ))
+    assert result.correct == 3
+    assert result.total == 4
+    assert result.score == 75
+    assert db.query(models.LearningEventDB).filter(
+        models.LearningEventDB.student_id == "test_taker",
+        models.LearningEventDB.activity_type == "test"
+    ).count() == 2
+
+    with pytest.raises(ValueError):
+        logic.score_daily_test(db, DailyTestSubmission(
+            student_id="test_taker", course_id=1, date=day, answers={9999: 0}, time_spent=10
+        ))
+
+def test_daily_test_cannot_be_resubmitted(db):
+    """Test a second submission for the same day is rejected and records nothing"""
+    from app.models import DailyTestSubmission
+    logic._daily_test_cache.clear()
+    _seed_questions(db, 1, 4)
+    day = date.today()
+
+    first = logic.score_daily_test(db, DailyTestSubmission(
+        student_id="repeat_taker", course_id=1, date=day, answers={}, time_spent=5
+    ))
+    assert first.score == 0
+
+    with pytest.raises(logic.DuplicateSubmissionError):
+        logic.score_daily_test(db, DailyTestSubmission(
+            student_id="repeat_taker", course_id=1, date=day, answers=first.correct_options, time_spent=5
+        ))
+    assert db.query(models.LearningEventDB).filter(
+        models.LearningEventDB.student_id == "repeat_taker"
+    ).count() == 2
+
+def test_student_login_cache_and_invalidation(db):
+    """Test login lookups are cached, including misses, and invalidated on creation"""
+    logic._student_cache.clear()
+    db.add(models.Student(id="cached_student", name="Cached"))
+    db.commit()
+
+    assert logic.get_student_profile(db, "cached_student") == {"id": "cached_student", "name": "Cached"}
+    assert logic.get_student_profile(db, "new_student") is None
+
+    # Served from memory: direct DB changes are not seen until invalidated
+    db.query(models.Student).filter(models.Student.id == "cached_student").delete()
+    db.commit()
+    assert logic.get_student_profile(db, "cached_student") is not None
+
+    logic.process_learning_event(db, LearningEvent(
+        student_id="new_student",
+        date=date.today(),
+        activity_type=ActivityType.PRACTICE,
+        topic="A", score=50, time_spent=20, attempt_number=1
+    ))
+    assert logic.get_student_profile(db, "new_student") == {"id": "new_student", "name": None}
+
+def test_student_login_cache_skips_write_after_concurrent_invalidation(db):
+    """Test a miss read before a concurrent creation is not cached as negative"""
+    logic._student_cache.clear()
+
+    class RacingQuery:
+        """Creates the student (and invalidates) right after the lookup reads"""
+        def __init__(self, query):
+            self.query = query
+        def filter(self, *args):
+            return RacingQuery(self.query.filter(*args))
+        def first(self):
+            result = self.query.first()
+            db.add(models.Student(id="racer", name="Racer"))
+            db.commit()
+            logic.invalidate_student("racer")
+            return result
+
+    class RacingSession:
+        def query(self, *args):
+            return RacingQuery(db.query(*args))
+
+    assert logic.get_student_profile(RacingSession(), "racer") is None
+    assert "racer" not in logic._student_cache
+    assert logic.get_student_profile(db, "racer") == {"id": "racer", "name": "Racer"}
+
+def test_batch_dashboard_matches_single_and_constant_queries(db):
+    """Test batch dashboards match per-student logic with a fixed query count"""
+    from sqlalchemy import event
+    from app.main import get_dashboard_stats
+
+    student_ids = [f"batch_{i}" for i in range(6)]
+    for n, student_id in enumerate(student_ids):
+        db.add(models.Student(id=student_id, name=student_id))
+        db.commit()
+        for days_ago in range(n + 1):
+            logic.process_learning_event(db, LearningEvent(
+                student_id=student_id,
+                date=date.today() - timedelta(days=days_ago),
+                activity_type=ActivityType.QUIZ if days_ago % 2 else ActivityType.PRACTICE,
+                topic="SQL", score=30 + 10 * days_ago, time_spent=20 + 15 * days_ago, attempt_number=1
+            ))
+
+    statements = []
+    def count(*args):
+        statements.append(args)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        logic.get_batch_dashboard_stats(db, student_ids[:1])
+        single_count = len(statements)
+        statements.clear()
+        batch = logic.get_batch_dashboard_stats(db, student_ids + ["missing"])
+        batch_count = len(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert batch_count == single_count
+    assert batch["missing"].student is None
+    for student_id in student_ids:
+        expected = get_dashboard_stats(student_id, db)
+        actual = batch[student_id]
+        assert actual.model_dump(exclude={"activity_distribution"}) == expected.model_dump(exclude={"activity_distribution"})
+        key = lambda a: a.activity_type
+        assert sorted(actual.activity_distribution, key=key) == sorted(expected.activity_distribution, key=key)
+
+def test_batch_confidence_matches_single_at_volatility_cutoff(db):
+    """Test batch confidence agrees with the per-student path when std dev sits exactly at 25"""
+    from app.main import get_dashboard_stats
+
+    student_id = "cutoff_student"
+    db.add(models.Student(id=student_id, name="Cutoff"))
+    db.commit()
+    for n, score in enumerate([25, 75, 25, 75, 25, 75]):
+        logic.process_learning_event(db, LearningEvent(
+            student_id=student_id,
+            date=date.today() - timedelta(days=n),
+            activity_type=ActivityType.QUIZ,
+            topic="SQL", score=score, time_spent=20, attempt_number=1
+        ))
+
+    single = get_dashboard_stats(student_id, db)
+    batch = logic.get_batch_dashboard_stats(db, [student_id])[student_id]
+    assert single.confidence_level == "High"
+    assert (batch.confidence_level, batch.confidence_reason) == (single.confidence_level, single.confidence_reason)
+
@@ -0,0 +1,50 @@
+import asyncio
+import importlib
+from app import database
+
+def test_import_does_not_touch_database():
+    """Importing the app must not create an engine or run schema setup"""
+    importlib.import_module("app.main")
+    importlib.import_module("seed")
+    assert database._engine is None
+
+def test_lifespan_creates_schema(monkeypatch, tmp_path):
+    """Test schema setup runs in the lifespan hook"""
+    from sqlalchemy import inspect
+    from sqlalchemy.orm import sessionmaker
+    from app.main import app, lifespan
+
+    # Fresh sessionmaker so the shared SessionLocal isn't left bound to the tmp engine
+    monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", f"sqlite:///{tmp_path / 'startup.db'}")
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False))
+
+    async def run():
+        async with lifespan(app):
+            pass
+    asyncio.run(run())
+
+    assert "learning_events" in inspect(database._engine).get_table_names()
+    database._engine.dispose()
+
+def test_concurrent_first_use_creates_one_engine(monkeypatch, tmp_path):
+    """Test racing first requests share a single engine"""
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy.orm import sessionmaker
+
+    created = []
+    real_create_engine = database.create_engine
+    def counting_create_engine(*args, **kwargs):
+        created.append(True)
+        return real_create_engine(*args, **kwargs)
+
+    monkeypatch.setattr(database, "create_engine", counting_create_engine)
+    monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", f"sqlite:///{tmp_path / 'race.db'}")
+    monkeypatch.setattr(database, "_engine", None)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(autocommit=False, autoflush=False))
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        engines = set(pool.map(lambda _: database.get_engine(), range(64)))
+
+    assert len(engines) == 1
+    assert len(created) == 1
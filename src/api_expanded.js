@@ -10,13 +10,14 @@ export const getCourses = async (studentId) => {
     return response.data;
 };
 
-export const getDailyTest = async () => {
-    const response = await api.get(`/test/daily`);
+export const getDailyTest = async (courseId = null) => {
+    const response = await api.get(`/test/daily`, { params: courseId ? { course_id: courseId } : {} });
     return response.data;
 };
 
-export const submitTest = async (eventData) => {
-    return await api.post(`/test/submit`, eventData);
+export const submitTest = async (submission) => {
+    const response = await api.post(`/test/submit`, submission);
+    return response.data;
 };
 
 export const getAnalysis = async (studentId) => {
@@ -4,10 +4,11 @@ import { getDailyTest, submitTest } from '../api_expanded';
 
 const DailyTest = ({ studentId }) => {
     const [test, setTest] = useState(null);
-    const [selectedOption, setSelectedOption] = useState(null);
+    const [answers, setAnswers] = useState({});
     const [submitted, setSubmitted] = useState(false);
-    const [isCorrect, setIsCorrect] = useState(false);
+    const [result, setResult] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [startedAt] = useState(Date.now());
 
     useEffect(() => {
         loadTest();
@@ -24,30 +25,30 @@ const DailyTest = ({ studentId }) => {
         }
     };
 
-    const handleSubmit = async () => {
-        if (selectedOption === null) return;
+    const allAnswered = test && test.questions.every(q => answers[q.id] !== undefined);
+    const isCorrect = result && result.correct === result.total;
 
-        const correct = selectedOption === test.correct_option;
-        setIsCorrect(correct);
-        setSubmitted(true);
+    const handleSubmit = async () => {
+        if (!allAnswered) return;
 
         try {
-            // Submit as Learning Event to update Streak
-            await submitTest({
+            // Scored server-side; also records the result as learning events to update Streak
+            const data = await submitTest({
                 student_id: studentId,
-                date: new Date().toISOString().split('T')[0],
-                activity_type: "test",
-                topic: "Daily Quiz",
-                score: correct ? 100 : 0,
-                time_spent: 5, // constant 5 mins for daily test
-                attempt_number: 1
+                course_id: test.course_id,
+                date: test.date,
+                answers,
+                time_spent: Math.max(1, Math.round((Date.now() - startedAt) / 60000))
             });
+            setResult(data);
+            setSubmitted(true);
         } catch (e) {
             console.error("Failed to submit result", e);
         }
     };
 
     if (loading) return <div>Loading Test...</div>;
+    if (!test) return <div>No test available today.</div>;
 
     return (
         <motion.div initial={{ opacity: 0 }} animate={{ opacity: 1 }}>
@@ -59,38 +60,42 @@ const DailyTest = ({ studentId }) => {
             <div className="glass-card" style={{ maxWidth: '600px', margin: '0 auto' }}>
                 {!submitted ? (
                     <>
-                        <h2 style={{ fontSize: '1.2rem', marginBottom: '1.5rem' }}>
-                            <span style={{ color: 'var(--accent)' }}>Q:</span> {test.question}
-                        </h2>
+                        {test.questions.map((q) => (
+                            <div key={q.id}>
+                                <h2 style={{ fontSize: '1.2rem', marginBottom: '1.5rem' }}>
+                                    <span style={{ color: 'var(--accent)' }}>Q:</span> {q.question}
+                                </h2>
 
-                        <div style={{ display: 'flex', flexDirection: 'column', gap: '1rem', marginBottom: '2rem' }}>
-                            {test.options.map((opt, idx) => (
-                                <button
-                                    key={idx}
-                                    onClick={() => setSelectedOption(idx)}
-                                    style={{
-                                        padding: '1rem',
-                                        borderRadius: '8px',
-                                        border: selectedOption === idx ? '2px solid var(--accent)' : '1px solid var(--border)',
-                                        background: selectedOption === idx ? 'rgba(139, 92, 246, 0.1)' : 'transparent',
-                                        color: 'var(--text-primary)',
-                                        textAlign: 'left',
-                                        cursor: 'pointer',
-                                        transition: 'all 0.2s'
-                                    }}
-                                >
-                                    {opt}
-                                </button>
-                            ))}
-                        </div>
+                                <div style={{ display: 'flex', flexDirection: 'column', gap: '1rem', marginBottom: '2rem' }}>
+                                    {q.options.map((opt, idx) => (
+                                        <button
+                                            key={idx}
+                                            onClick={() => setAnswers({ ...answers, [q.id]: idx })}
+                                            style={{
+                                                padding: '1rem',
+                                                borderRadius: '8px',
+                                                border: answers[q.id] === idx ? '2px solid var(--accent)' : '1px solid var(--border)',
+                                                background: answers[q.id] === idx ? 'rgba(139, 92, 246, 0.1)' : 'transparent',
+                                                color: 'var(--text-primary)',
+                                                textAlign: 'left',
+                                                cursor: 'pointer',
+                                                transition: 'all 0.2s'
+                                            }}
+                                        >
+                                            {opt}
+                                        </button>
+                                    ))}
+                                </div>
+                            </div>
+                        ))}
 
                         <button
                             className="btn"
                             onClick={handleSubmit}
-                            disabled={selectedOption === null}
-                            style={{ width: '100%', opacity: selectedOption === null ? 0.5 : 1 }}
+                            disabled={!allAnswered}
+                            style={{ width: '100%', opacity: allAnswered ? 1 : 0.5 }}
                         >
-                            Submit Answer
+                            Submit Answers
                         </button>
                     </>
                 ) : (
@@ -103,6 +108,9 @@ const DailyTest = ({ studentId }) => {
                             {isCorrect ? '🎉' : '📚'}
                         </motion.div>
                         <h2>{isCorrect ? 'Excellent Work!' : 'Keep Learning!'}</h2>
+                        <p style={{ fontSize: '1.5rem', marginBottom: '1rem' }}>
+                            {result.correct} / {result.total} correct
+                        </p>
                         <p style={{ color: 'var(--text-secondary)', marginBottom: '2rem' }}>
                             {isCorrect ? 'Your streak has been updated.' : 'Good attempt. Review the topic and try again tomorrow.'}
                         </p>